@@ -1,16 +1,67 @@
 import os
-import json
+import atexit
+import threading
 from dotenv import load_dotenv
-import pyodbc
 from flask import Flask, request, jsonify, send_from_directory
 from predict import predict_job
+from persistence import build_row, make_store, parse_ts, PersistQueue
+from shadow import ShadowScorer
 
 load_dotenv()
-def get_conn():
-    conn_str = os.getenv("DB_CONN_STR")
-    if not conn_str:
-        raise RuntimeError("DB_CONN_STR env var is missing.")
-    return pyodbc.connect(conn_str)
+
+# ------------------ PERSISTENCE ------------------
+# /predict with {"save": true} enqueues the row here (no second /save round-trip)
+_store = None
+_persist = None
+_init_lock = threading.Lock()  # concurrent first requests must not build two of each
+
+def get_store():
+    global _store
+    if _store is None:
+        with _init_lock:
+            if _store is None:
+                _store = make_store()
+    return _store
+
+def get_persist_queue():
+    global _persist
+    if _persist is None:
+        store = get_store()
+        with _init_lock:
+            if _persist is None:
+                _persist = PersistQueue(
+                    store,
+                    maxsize=int(os.getenv("PERSIST_QUEUE_SIZE", "1000")),
+                    retries=int(os.getenv("PERSIST_RETRIES", "3")),
+                    spill_path=os.getenv("PERSIST_SPILL_PATH", "predictions_spill.jsonl"),
+                )
+                atexit.register(_persist.close)
+    return _persist
+
+# ------------------ SHADOW MODEL ------------------
+# SHADOW_MODEL_PATH set -> a sample of requests is re-scored in a separate process.
+# Not started on import (tooling, the reloader's watcher and a --preload master would
+# each load a second model): gunicorn.conf.py starts it in every worker after the fork,
+# `python app.py` in the reloader's serving process. A bad shadow config only
+# disables shadow mode, it never breaks /predict.
+_shadow = None
+
+def _start_shadow():
+    try:
+        scorer = ShadowScorer.from_env()
+    except Exception as e:
+        print("Shadow mode disabled:", e)
+        return None
+    if scorer is not None:
+        atexit.register(scorer.close)
+    return scorer
+
+def init_shadow():
+    global _shadow
+    with _init_lock:
+        if _shadow is None:
+            _shadow = _start_shadow()
+    return _shadow
 
 
 app = Flask(__name__, static_folder="static")
@@ -26,6 +77,19 @@ def predict():
     if not text:
         return jsonify({"error": "Text is required"}), 400
     result = predict_job(text)
+
+    if data.get("save"):
+        try:
+            get_persist_queue().submit(build_row(text, result))
+        except Exception as e:
+            print("Persist enqueue failed:", e)
+
+    if _shadow is not None:
+        try:
+            _shadow.submit(text, result)
+        except Exception as e:
+            print("Shadow submit failed:", e)
+
     return jsonify(result)
 
 @app.post("/save")
@@ -39,52 +103,37 @@ def save():
     if not result:
         return jsonify({"error": "Result is required"}), 400
 
-    p = float(result.get("prob_fake", 0) or 0)
-    status = "LIKELY_FAKE" if p >= 0.70 else "LIKELY_REAL"
-
-    reasons = []
-    reasons += (result.get("flags", {}).get("reasons") or [])
-    reasons += (result.get("skill_check", {}).get("reasons") or [])
-    reasons += (result.get("salary_check", {}).get("reasons") or [])
-    reasons_text = "\n".join(dict.fromkeys(reasons)) if reasons else None
-
-    sc = result.get("skill_check") or {}
-    sal = result.get("salary_check") or {}
-
-    with get_conn() as conn:
-        cur = conn.cursor()
-        cur.execute("""
-            INSERT INTO dbo.Predictions
-            (JobText, Status, ProbFake, Reasons,
-             RoleGuess, RoleConfidence, SkillsFound, SkillReasons,
-             SalaryMin, SalaryMax, SalaryZone, SalaryAnomalyScore, SalaryFlag, SalaryReasons,
-             InsightsJson)
-            VALUES
-            (?, ?, ?, ?,
-             ?, ?, ?, ?,
-             ?, ?, ?, ?, ?, ?,
-             ?)
-        """, (
-            text, status, p, reasons_text,
-
-            sc.get("role_guess"),
-            float(sc.get("role_confidence", 0) or 0),
-            sc.get("mismatch_score"),
-            json.dumps(sc.get("skills_found", []), ensure_ascii=False),
-            "\n".join(sc.get("reasons", []) or []),
-
-            sal.get("offered_min"),
-            sal.get("offered_max"),
-            sal.get("zone"),
-            sal.get("anomaly_score"),
-            1 if sal.get("flag") else 0,
-            "\n".join(sal.get("reasons", []) or []),
-
-            json.dumps(result, ensure_ascii=False)
-        ))
-        conn.commit()
+    get_store().write(build_row(text, result))
 
     return jsonify({"ok": True})
 
+@app.get("/predictions")
+def list_predictions():
+    """
+    Recent predictions, newest first.
+    ?status=LIKELY_FAKE&role=Data Analyst&zone=RED&since=2026-01-01&until=...&limit=50&cursor=...
+    """
+    args = request.args
+    try:
+        limit = max(1, min(200, int(args.get("limit", 50))))
+        since = parse_ts(args["since"]) if args.get("since") else None
+        until = parse_ts(args["until"]) if args.get("until") else None
+        page = get_store().recent(
+            limit=limit,
+            status=args.get("status"),
+            role=args.get("role"),
+            zone=args.get("zone"),
+            since=since,
+            until=until,
+            cursor=args.get("cursor"),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e) or "Invalid query parameter"}), 400
+
+    return jsonify(page)
+
 if __name__ == "__main__":
+    # debug=True runs a watcher process + a serving child; only the child serves requests
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        init_shadow()
     app.run(debug=True)
@@ -0,0 +1,60 @@
+# benchmarks/bench_full_text.py
+# Row-wise agg(" ".join, axis=1) vs text_features.build_full_text on synthetic postings,
+# then load_postings() from a CSV: cold (read_csv + join + write cache) vs warm cache.
+# Usage: python benchmarks/bench_full_text.py [rows]   (default 1,000,000)
+import os
+import sys
+import time
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from text_features import TEXT_COLS, build_full_text, load_postings
+
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+rng = np.random.default_rng(42)
+words = np.array(["data", "analyst", "sales", "remote", "india", "python", "excel",
+                  "urgent", "hiring", "fresher", "salary", "month", "team", "client"])
+
+def col(n_words, null_rate):
+    # a small pool of distinct strings, sampled per row, with missing values
+    pool = np.array([" ".join(rng.choice(words, n_words)) for _ in range(5000)], dtype=object)
+    vals = pool[rng.integers(0, len(pool), N)]
+    vals[rng.random(N) < null_rate] = None
+    return vals
+
+df = pd.DataFrame({c: col(30 if c in ("company_profile", "description", "requirements", "benefits") else 3, 0.2)
+                   for c in TEXT_COLS})
+print(f"rows={N:,} cols={len(TEXT_COLS)}")
+
+t0 = time.perf_counter()
+old = df[TEXT_COLS].fillna("").astype(str).agg(" ".join, axis=1)
+t_old = time.perf_counter() - t0
+
+t0 = time.perf_counter()
+new = build_full_text(df)
+t_new = time.perf_counter() - t0
+
+assert old.equals(new), "outputs differ"
+print(f"agg(' '.join, axis=1): {t_old:8.2f}s")
+print(f"build_full_text:       {t_new:8.2f}s   ({t_old / t_new:.1f}x faster, identical output)")
+
+tmp = tempfile.mkdtemp(prefix="bench_full_text_")
+try:
+    csv_path = os.path.join(tmp, "postings.csv")
+    df.to_csv(csv_path, index=False)
+    cache_dir = os.path.join(tmp, "cache")
+    print(f"\nload_postings on a {os.path.getsize(csv_path) / 1e6:,.0f} MB CSV:")
+
+    for name, kw in (("cold (read_csv + join + cache write)", {}),
+                     ("warm (stat key, cached frame)", {}),
+                     ("warm + verify_hash (sha256 of CSV)", {"verify_hash": True})):
+        t0 = time.perf_counter()
+        loaded = load_postings(csv_path, cache_dir=cache_dir, **kw)
+        print(f"  {name:<38} {time.perf_counter() - t0:8.2f}s")
+    assert loaded["full_text"].equals(new.rename("full_text")), "cached full_text differs"
+finally:
+    shutil.rmtree(tmp)
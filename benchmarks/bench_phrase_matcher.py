@@ -0,0 +1,56 @@
+# benchmarks/bench_phrase_matcher.py
+# Per-posting rule-matching latency as the phrase dictionary grows:
+# PhraseMatcher (one trie regex, one pass) vs the old per-list any(p in t) loop.
+# Usage: python benchmarks/bench_phrase_matcher.py
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from phrase_matcher import PhraseMatcher, I18N_PHRASES, norm_text
+
+random.seed(42)
+LATIN = ("job salary work home daily earn fees dena hoga kaam ghar baithe interview joining "
+         "offer letter company team apply bank account whatsapp telegram part time month").split()
+DEVA = "नौकरी वेतन काम घर बैठे फीस जमा इंटरव्यू कंपनी ऑफर लेटर महीना कमाई व्हाट्सएप".split()
+VOCAB = LATIN + DEVA
+
+SYL_LATIN = "ka ki ku ra ri ru ma mi na ne pa pe sa si ta ti ja jo ha ho la lo da de ba bo ga go".split()
+SYL_DEVA = "क कि कु र रि म मि न ने प पे स सि त ति ज जो ह हो ल लो द दे ब बो ग गो".split()
+
+def pseudo_word():
+    syl = SYL_DEVA if random.random() < 0.4 else SYL_LATIN
+    return "".join(random.choice(syl) for _ in range(random.randint(2, 4)))
+
+def synthetic_phrases(n):
+    # made-up transliterations: like a real dictionary, most never occur in a given posting
+    out = set()
+    while len(out) < n:
+        out.add(" ".join(pseudo_word() for _ in range(random.randint(1, 3))))
+    return sorted(out)
+
+def posting():
+    words = [random.choice(VOCAB + ["the", "and", "with", "for", "we", "are", "hiring"]) for _ in range(250)]
+    return norm_text(" ".join(words))  # ~1.5 KB, mixed Latin + Devanagari
+
+POSTS = [posting() for _ in range(200)]
+BASE = {k: list(v) for k, v in I18N_PHRASES().items()}
+
+def per_post_us(fn):
+    fn(POSTS[0])  # warm up (regex compile caches etc.)
+    t0 = time.perf_counter()
+    for t in POSTS:
+        fn(t)
+    return (time.perf_counter() - t0) / len(POSTS) * 1e6
+
+print(f"{'phrases':>8} {'PhraseMatcher':>15} {'any() loop':>14}")
+for extra in (0, 1_000, 5_000, 20_000, 50_000):
+    rules = {k: list(v) for k, v in BASE.items()}
+    rules["synthetic"] = synthetic_phrases(extra) if extra else []
+    m = PhraseMatcher(rules)
+
+    lists = {k: [norm_text(p) for p in v] for k, v in rules.items()}
+    naive = lambda t: {k for k, v in lists.items() if any(p in t for p in v)}
+
+    print(f"{m.size:>8,} {per_post_us(m.match):>12.0f} us {per_post_us(naive):>11.0f} us")
@@ -0,0 +1,129 @@
+# calibration.py
+import os
+import json
+import bisect
+from functools import lru_cache
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MODEL_PATH = os.path.join(BASE_DIR, "fake_job_model_pipeline.pkl")
+
+# Label cutoffs on the fake probability.
+#   fake/check -> FAKE / CHECK / REAL label and LIKELY_FAKE status
+#   decision   -> binary 0/1 prediction used by scoring + graphs
+# These are the historical operating points on the RAW model probability. They are
+# used as-is for models without a calibration file; fit_isotonic() maps them
+# through the calibration so a calibrated model keeps the same operating point.
+DEFAULT_THRESHOLDS = {"fake": 0.70, "check": 0.40, "decision": 0.50}
+
+# Rule floors/caps used by predict.py, same scale as the thresholds:
+#   one_strong -> one strong flag ("CHECK-ish"), two_strong -> 2+ strong flags ("FAKE-ish"),
+#   soft       -> 2+ soft flags, legit_cap -> ceiling when legit signals and no strong flag.
+# Historical raw values; mapped through the calibration like the thresholds.
+DEFAULT_FLOORS = {"one_strong": 0.65, "two_strong": 0.85, "soft": 0.45, "legit_cap": 0.45}
+BELOW_FAKE = ("one_strong", "soft", "legit_cap")  # must never produce a FAKE label
+
+
+def calibration_path(model_path: str) -> str:
+    # fake_job_model_pipeline.pkl -> fake_job_model_pipeline.calibration.json
+    return os.path.splitext(model_path)[0] + ".calibration.json"
+
+
+def _interp(x, y, p: float) -> float:
+    """Same as np.interp(p, x, y) for one value: binary search + linear step."""
+    p = float(p)
+    if not x:
+        return p
+    if p <= x[0]:
+        return y[0]
+    if p >= x[-1]:
+        return y[-1]
+    i = bisect.bisect_right(x, p)
+    x0, x1, y0, y1 = x[i - 1], x[i], y[i - 1], y[i]
+    return y0 if x1 == x0 else y0 + (y1 - y0) * (p - x0) / (x1 - x0)
+
+
+class Calibration:
+    """
+    Piecewise-linear map raw_prob -> calibrated_prob (isotonic fit, stored as a
+    small x/y table) + the label thresholds that go with it.
+    An empty table means identity (old models without a calibration file).
+    Floors missing from the file are the defaults mapped through the table, so the
+    identity case reproduces the historical numbers exactly.
+    Raises ValueError if the cutoffs leave no CHECK band or a floor reaches FAKE.
+    """
+
+    def __init__(self, x=None, y=None, thresholds=None, method="identity", floors=None):
+        self.x = [float(v) for v in (x or [])]
+        self.y = [float(v) for v in (y or [])]
+        self.method = method
+        self.thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+        self.floors = {k: round(self.apply(v), 6) for k, v in DEFAULT_FLOORS.items()}
+        self.floors.update(floors or {})
+        self.validate()
+
+    def validate(self):
+        t, f = self.thresholds, self.floors
+        if t["check"] >= t["fake"]:
+            raise ValueError(f"check cutoff {t['check']} is not below fake cutoff {t['fake']}: "
+                             "the CHECK band is empty")
+        for k in BELOW_FAKE:
+            if f[k] >= t["fake"]:
+                raise ValueError(f"rule floor {k}={f[k]} reaches the fake cutoff {t['fake']}")
+
+    def apply(self, p: float) -> float:
+        return _interp(self.x, self.y, p)
+
+    def apply_many(self, probs):
+        """Vectorized version for batch scoring (numpy array in, numpy array out)."""
+        import numpy as np
+        probs = np.asarray(probs, dtype=float)
+        return np.interp(probs, self.x, self.y) if self.x else probs
+
+    def label(self, p: float) -> str:
+        t = self.thresholds
+        return "FAKE" if p >= t["fake"] else ("CHECK" if p >= t["check"] else "REAL")
+
+    def to_dict(self) -> dict:
+        return {"method": self.method, "x": self.x, "y": self.y,
+                "thresholds": self.thresholds, "floors": self.floors}
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def fit_isotonic(raw_probs, y_true, raw_cutoffs=DEFAULT_THRESHOLDS, raw_floors=DEFAULT_FLOORS) -> Calibration:
+    """
+    Fit on held-out data (never on the rows the model was trained on).
+    Label thresholds and rule floors are the calibrated values of raw_cutoffs /
+    raw_floors. The mapping is monotonic, so each keeps (almost) the same operating
+    point as before calibration; only raw scores in the same flat isotonic step just
+    below a raw cutoff move across it.
+
+    A floor that must stay below FAKE but lands on the fake cutoff's step falls back
+    to the middle of the CHECK band. If check and fake land on the same step there
+    is no CHECK band at all: ValueError (more calibration data is needed).
+    """
+    from sklearn.isotonic import IsotonicRegression
+    iso = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds="clip")
+    iso.fit(raw_probs, y_true)
+    x = [round(float(v), 6) for v in iso.X_thresholds_]
+    y = [round(float(v), 6) for v in iso.y_thresholds_]
+    thresholds = {k: round(_interp(x, y, v), 6) for k, v in raw_cutoffs.items()}
+    floors = {k: round(_interp(x, y, v), 6) for k, v in raw_floors.items()}
+    if thresholds["check"] < thresholds["fake"]:
+        mid = round((thresholds["check"] + thresholds["fake"]) / 2, 6)
+        for k in BELOW_FAKE:
+            if floors[k] >= thresholds["fake"]:
+                floors[k] = mid
+    return Calibration(x, y, thresholds, method="isotonic", floors=floors)
+
+
+@lru_cache(maxsize=None)
+def load_calibration(model_path: str = DEFAULT_MODEL_PATH) -> Calibration:
+    path = calibration_path(model_path)
+    if not os.path.exists(path):
+        return Calibration()
+    with open(path, encoding="utf-8") as f:
+        d = json.load(f)
+    return Calibration(d.get("x"), d.get("y"), d.get("thresholds"), d.get("method", "isotonic"), d.get("floors"))
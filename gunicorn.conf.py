@@ -0,0 +1,7 @@
+# gunicorn.conf.py (gunicorn reads it from the working directory automatically)
+
+def post_worker_init(worker):
+    # shadow scorer per worker, started after the fork: never in the master, so
+    # --preload does not hand every worker a dead feeder thread
+    from app import init_shadow
+    init_shadow()
@@ -10,18 +10,15 @@ from sklearn.metrics import (
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import r2_score, mean_absolute_error
+from calibration import load_calibration
+from text_features import load_postings
+
+# prob_fake in scored_posts.csv is already calibrated; only the cutoffs are needed
+TH = load_calibration("fake_job_model_pipeline.pkl").thresholds
 
 # 1) Load scored data
 df = pd.read_csv("scored_posts.csv")
-raw = pd.read_csv("fake_job_postings.csv")
-
-text_cols = [
-    "title","location","department","company_profile","description",
-    "requirements","benefits","employment_type","required_experience",
-    "required_education","industry","function","salary_range"
-]
-text_cols = [c for c in text_cols if c in raw.columns]
-raw["full_text"] = raw[text_cols].fillna("").astype(str).agg(" ".join, axis=1)
+raw = load_postings("fake_job_postings.csv")
 
 df = df.merge(raw[["job_id","full_text"]], on="job_id", how="left")
 
@@ -39,7 +36,7 @@ y_true = df["fraudulent"].astype(int).values
 proba  = df["prob_fake"].astype(float).values
 
 # ---------- Chart 1: Confusion Matrix ----------
-THRESH = 0.50
+THRESH = TH["decision"]
 pred = (proba >= THRESH).astype(int)
 
 cm = confusion_matrix(y_true, pred)
@@ -49,7 +46,8 @@ plt.title(f"Confusion Matrix (threshold={THRESH})")
 plt.show()
 
 # ---------- Chart 2: Fraud Rate by Risk Level ----------
-bins = [0, 0.33, 0.66, 1.0]
+# same cutoffs as the REAL / CHECK / FAKE labels
+bins = [0, TH["check"], TH["fake"], 1.0]
 labels = ["Low Risk", "Medium Risk", "High Risk"]
 
 df["risk_level"] = pd.cut(df["prob_fake"], bins=bins, labels=labels, include_lowest=True)
@@ -4,9 +4,11 @@ import pandas as pd
 import joblib
 import numpy as np
 from skill_salary_rules import run_skill_check, run_salary_check
+from calibration import load_calibration
+from text_features import load_postings
 
-# 1) Load dataset
-df = pd.read_csv("fake_job_postings.csv")
+# 1) Load dataset (+ full_text, same builder as training)
+df = load_postings("fake_job_postings.csv")
 
 # ✅ BALANCED SAMPLE (fast + graphs clear)
 df_fake = df[df["fraudulent"] == 1]
@@ -19,22 +21,13 @@ df_real = df_real.sample(n, random_state=42)
 df = pd.concat([df_real, df_fake], ignore_index=True)
 print("Balanced sample sizes -> REAL:", len(df_real), "FAKE:", len(df_fake))
 
-# 2) Build full_text (same as training)
-text_cols = [
-    "title","location","department","company_profile","description",
-    "requirements","benefits","employment_type","required_experience",
-    "required_education","industry","function",
-    "salary_range"
-]
-text_cols = [c for c in text_cols if c in df.columns]
-df["full_text"] = df[text_cols].fillna("").astype(str).agg(" ".join, axis=1)
-
-# 3) Load saved ML model
+# 2) Load saved ML model (+ calibration table / thresholds)
 model = joblib.load("fake_job_model_pipeline.pkl")
+calib = load_calibration("fake_job_model_pipeline.pkl")
 
-# 4) ML outputs
-df["prob_fake"] = model.predict_proba(df["full_text"])[:, 1]
-THRESH = 0.50
+# 3) ML outputs
+df["prob_fake"] = calib.apply_many(model.predict_proba(df["full_text"])[:, 1])
+THRESH = calib.thresholds["decision"]
 df["pred_label"] = (df["prob_fake"] >= THRESH).astype(int)
 
 role_guess_list = []
@@ -0,0 +1,77 @@
+-- 001_predictions_query_indexes.sql
+-- Typed columns + indexes behind GET /predictions (keyset pagination, newest first).
+-- Idempotent: safe to run more than once. Run with sqlcmd / SSMS (uses GO batches).
+-- SQLite twin: persistence.SqliteStore.migrate()
+--
+-- DEPLOY ORDER: run this BEFORE deploying the app version that writes the typed
+-- columns (CreatedAt, Label, ModelProbFake, StrongFlags, SoftFlags). The new INSERT
+-- names them, so against an unmigrated table /save returns 500 and every
+-- /predict row ends up in the spill file (replay it afterwards:
+-- python persistence.py replay).
+--
+-- Rows written before this migration have no real timestamp: their CreatedAt is
+-- 1970-01-01 00:00:00 in both stores, so a since/until window never includes them
+-- (they are still reachable without a time filter).
+
+IF COL_LENGTH('dbo.Predictions', 'Id') IS NULL
+    ALTER TABLE dbo.Predictions ADD Id BIGINT IDENTITY(1,1) NOT NULL;
+GO
+
+-- NOT NULL + default fills existing rows with the epoch; the default is then switched
+-- to SYSUTCDATETIME() below for writers that do not send CreatedAt
+IF COL_LENGTH('dbo.Predictions', 'CreatedAt') IS NULL
+    ALTER TABLE dbo.Predictions ADD CreatedAt DATETIME2(3) NOT NULL
+        CONSTRAINT DF_Predictions_CreatedAt DEFAULT '1970-01-01T00:00:00';
+IF COL_LENGTH('dbo.Predictions', 'Label') IS NULL
+    ALTER TABLE dbo.Predictions ADD Label VARCHAR(10) NULL;
+IF COL_LENGTH('dbo.Predictions', 'ModelProbFake') IS NULL
+    ALTER TABLE dbo.Predictions ADD ModelProbFake FLOAT NULL;
+IF COL_LENGTH('dbo.Predictions', 'StrongFlags') IS NULL
+    ALTER TABLE dbo.Predictions ADD StrongFlags INT NULL;
+IF COL_LENGTH('dbo.Predictions', 'SoftFlags') IS NULL
+    ALTER TABLE dbo.Predictions ADD SoftFlags INT NULL;
+GO
+
+IF EXISTS (SELECT 1 FROM sys.default_constraints WHERE name = 'DF_Predictions_CreatedAt' AND definition LIKE '%1970%')
+BEGIN
+    ALTER TABLE dbo.Predictions DROP CONSTRAINT DF_Predictions_CreatedAt;
+    ALTER TABLE dbo.Predictions ADD CONSTRAINT DF_Predictions_CreatedAt DEFAULT SYSUTCDATETIME() FOR CreatedAt;
+END
+GO
+
+-- Index keys cannot be (N)VARCHAR(MAX): narrow the filter columns if they were created that way
+IF EXISTS (SELECT 1 FROM sys.columns WHERE object_id = OBJECT_ID('dbo.Predictions') AND name = 'Status' AND max_length = -1)
+    ALTER TABLE dbo.Predictions ALTER COLUMN Status NVARCHAR(20) NULL;
+IF EXISTS (SELECT 1 FROM sys.columns WHERE object_id = OBJECT_ID('dbo.Predictions') AND name = 'RoleGuess' AND max_length = -1)
+    ALTER TABLE dbo.Predictions ALTER COLUMN RoleGuess NVARCHAR(100) NULL;
+IF EXISTS (SELECT 1 FROM sys.columns WHERE object_id = OBJECT_ID('dbo.Predictions') AND name = 'SalaryZone' AND max_length = -1)
+    ALTER TABLE dbo.Predictions ALTER COLUMN SalaryZone NVARCHAR(20) NULL;
+GO
+
+-- Backfill typed columns from the InsightsJson blob (one-off; new rows are written typed)
+UPDATE dbo.Predictions SET
+    Label = JSON_VALUE(InsightsJson, '$.model.label'),
+    ModelProbFake = TRY_CAST(JSON_VALUE(InsightsJson, '$.model.prob_fake') AS FLOAT),
+    StrongFlags = TRY_CAST(JSON_VALUE(InsightsJson, '$.flags.strong') AS INT),
+    SoftFlags = TRY_CAST(JSON_VALUE(InsightsJson, '$.flags.soft') AS INT)
+WHERE Label IS NULL AND ISJSON(InsightsJson) = 1;
+GO
+
+-- Equality filter first, then the (CreatedAt, Id) keyset order.
+-- INCLUDE the list columns so a page is served from the index alone.
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Predictions_CreatedAt' AND object_id = OBJECT_ID('dbo.Predictions'))
+    CREATE INDEX IX_Predictions_CreatedAt ON dbo.Predictions (CreatedAt DESC, Id DESC)
+    INCLUDE (Status, Label, ProbFake, ModelProbFake, RoleGuess, SalaryZone);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Predictions_Status_CreatedAt' AND object_id = OBJECT_ID('dbo.Predictions'))
+    CREATE INDEX IX_Predictions_Status_CreatedAt ON dbo.Predictions (Status, CreatedAt DESC, Id DESC)
+    INCLUDE (Label, ProbFake, ModelProbFake, RoleGuess, SalaryZone);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Predictions_RoleGuess_CreatedAt' AND object_id = OBJECT_ID('dbo.Predictions'))
+    CREATE INDEX IX_Predictions_RoleGuess_CreatedAt ON dbo.Predictions (RoleGuess, CreatedAt DESC, Id DESC)
+    INCLUDE (Status, Label, ProbFake, ModelProbFake, SalaryZone);
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Predictions_SalaryZone_CreatedAt' AND object_id = OBJECT_ID('dbo.Predictions'))
+    CREATE INDEX IX_Predictions_SalaryZone_CreatedAt ON dbo.Predictions (SalaryZone, CreatedAt DESC, Id DESC)
+    INCLUDE (Status, Label, ProbFake, ModelProbFake, RoleGuess);
+GO
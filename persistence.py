@@ -0,0 +1,464 @@
+# persistence.py
+import os
+import json
+import time
+import queue
+import glob
+import base64
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from calibration import load_calibration
+
+# ------------------ ROW BUILDING ------------------
+# Column order of dbo.Predictions (same order for every store)
+COLUMNS = [
+    "JobText", "Status", "ProbFake", "Reasons",
+    "RoleGuess", "RoleConfidence", "SkillsFound", "SkillReasons",
+    "SalaryMin", "SalaryMax", "SalaryZone", "SalaryAnomalyScore", "SalaryFlag", "SalaryReasons",
+    "InsightsJson",
+    # typed columns added by migrations/001_predictions_query_indexes.sql
+    "CreatedAt", "Label", "ModelProbFake", "StrongFlags", "SoftFlags",
+]
+
+# Columns returned by the read API (no JobText / InsightsJson blobs)
+LIST_COLUMNS = [
+    "Id", "CreatedAt", "Status", "Label", "ProbFake", "ModelProbFake",
+    "StrongFlags", "SoftFlags", "RoleGuess", "RoleConfidence",
+    "SalaryZone", "SalaryAnomalyScore", "SalaryFlag",
+]
+
+TS_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+def now_ts() -> str:
+    # UTC, millisecond precision; sorts correctly as text (SQLite) and casts to DATETIME2 (SQL Server)
+    return datetime.now(timezone.utc).strftime(TS_FORMAT)[:-3]
+
+def parse_ts(value: str) -> str:
+    """ISO date/datetime from a query string -> storage format (UTC). Raises ValueError."""
+    dt = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt.strftime(TS_FORMAT)[:-3]
+
+def build_row(text: str, result: dict) -> dict:
+    """Turn a predict_job() result into a dbo.Predictions row (column -> value)."""
+    p = float(result.get("prob_fake", 0) or 0)
+    label = result.get("label") or load_calibration().label(p)  # older /save payloads carry no label
+    status = "LIKELY_FAKE" if label == "FAKE" else "LIKELY_REAL"
+
+    reasons = []
+    reasons += (result.get("flags", {}).get("reasons") or [])
+    reasons += (result.get("skill_check", {}).get("reasons") or [])
+    reasons += (result.get("salary_check", {}).get("reasons") or [])
+    reasons_text = "\n".join(dict.fromkeys(reasons)) if reasons else None
+
+    sc = result.get("skill_check") or {}
+    sal = result.get("salary_check") or {}
+    model = result.get("model") or {}
+    flags = result.get("flags") or {}
+
+    return {
+        "JobText": text,
+        "Status": status,
+        "ProbFake": p,
+        "Reasons": reasons_text,
+
+        "RoleGuess": sc.get("role_guess"),
+        "RoleConfidence": float(sc.get("role_confidence", 0) or 0),
+        "SkillsFound": json.dumps(sc.get("skills_found", []), ensure_ascii=False),
+        "SkillReasons": "\n".join(sc.get("reasons", []) or []),
+
+        "SalaryMin": sal.get("offered_min"),
+        "SalaryMax": sal.get("offered_max"),
+        "SalaryZone": sal.get("zone"),
+        "SalaryAnomalyScore": sal.get("anomaly_score"),
+        "SalaryFlag": 1 if sal.get("flag") else 0,
+        "SalaryReasons": "\n".join(sal.get("reasons", []) or []),
+
+        "InsightsJson": json.dumps(result, ensure_ascii=False),
+
+        # stamped at request time, not when the background writer gets to it
+        "CreatedAt": now_ts(),
+        "Label": label,
+        "ModelProbFake": model.get("prob_fake"),
+        "StrongFlags": flags.get("strong"),
+        "SoftFlags": flags.get("soft"),
+    }
+
+def _insert_sql(table: str) -> str:
+    cols = ", ".join(COLUMNS)
+    marks = ", ".join("?" for _ in COLUMNS)
+    return f"INSERT INTO {table} ({cols}) VALUES ({marks})"
+
+# ------------------ READ QUERIES (keyset pagination) ------------------
+def encode_cursor(created_at, row_id) -> str:
+    if isinstance(created_at, datetime):
+        created_at = created_at.strftime(TS_FORMAT)[:-3]
+    raw = json.dumps([created_at, int(row_id)])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str):
+    """Raises ValueError on a malformed cursor."""
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(created_at), int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor.")
+
+def _where(status=None, role=None, zone=None, since=None, until=None, cursor=None):
+    """
+    Equality filters + time window + keyset condition.
+    Every filter is a leading column of one of the (X, CreatedAt, Id) indexes,
+    so the newest-first scan never touches rows outside the page.
+    """
+    conds, params = [], []
+    for col, val in (("Status", status), ("RoleGuess", role), ("SalaryZone", zone)):
+        if val:
+            conds.append(f"{col} = ?")
+            params.append(val)
+    if since:
+        conds.append("CreatedAt >= ?")
+        params.append(since)
+    if until:
+        conds.append("CreatedAt < ?")
+        params.append(until)
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        conds.append("(CreatedAt < ? OR (CreatedAt = ? AND Id < ?))")
+        params += [created_at, created_at, row_id]
+    return (" WHERE " + " AND ".join(conds)) if conds else "", params
+
+def _page(cur, rows, limit):
+    cols = [d[0] for d in cur.description]
+    items = []
+    for r in rows[:limit]:
+        item = dict(zip(cols, r))
+        if isinstance(item.get("CreatedAt"), datetime):
+            item["CreatedAt"] = item["CreatedAt"].strftime(TS_FORMAT)[:-3]
+        items.append(item)
+    # fetched limit+1 rows: the extra one tells us there is a next page
+    next_cursor = encode_cursor(items[-1]["CreatedAt"], items[-1]["Id"]) if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+# ------------------ STORES ------------------
+# Same names/columns as migrations/001_predictions_query_indexes.sql
+INDEXES = [
+    ("IX_Predictions_CreatedAt", "CreatedAt DESC, Id DESC"),
+    ("IX_Predictions_Status_CreatedAt", "Status, CreatedAt DESC, Id DESC"),
+    ("IX_Predictions_RoleGuess_CreatedAt", "RoleGuess, CreatedAt DESC, Id DESC"),
+    ("IX_Predictions_SalaryZone_CreatedAt", "SalaryZone, CreatedAt DESC, Id DESC"),
+]
+
+class OdbcStore:
+    """SQL Server store (production). pyodbc is only imported when used."""
+    table = "dbo.Predictions"
+
+    def __init__(self, conn_str: str):
+        if not conn_str:
+            raise RuntimeError("DB_CONN_STR env var is missing.")
+        self.conn_str = conn_str
+
+    def connect(self):
+        import pyodbc
+        return pyodbc.connect(self.conn_str)
+
+    def write(self, row: dict):
+        with self.connect() as conn:
+            cur = conn.cursor()
+            cur.execute(_insert_sql(self.table), [row.get(c) for c in COLUMNS])
+            conn.commit()
+
+    def recent(self, limit=50, **filters) -> dict:
+        where, params = _where(**filters)
+        sql = (
+            f"SELECT TOP ({int(limit) + 1}) {', '.join(LIST_COLUMNS)} FROM {self.table}"
+            f"{where} ORDER BY CreatedAt DESC, Id DESC"
+        )
+        with self.connect() as conn:
+            cur = conn.cursor()
+            cur.execute(sql, params)
+            return _page(cur, cur.fetchall(), limit)
+
+
+class SqliteStore:
+    """Local SQLite store with the same columns (dev / tests)."""
+    table = "Predictions"
+
+    def __init__(self, path: str):
+        self.path = path
+        conn = self.connect()
+        try:
+            with conn:
+                conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self.table} (
+                        Id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        JobText TEXT, Status TEXT, ProbFake REAL, Reasons TEXT,
+                        RoleGuess TEXT, RoleConfidence REAL, SkillsFound TEXT, SkillReasons TEXT,
+                        SalaryMin INTEGER, SalaryMax INTEGER, SalaryZone TEXT,
+                        SalaryAnomalyScore REAL, SalaryFlag INTEGER, SalaryReasons TEXT,
+                        InsightsJson TEXT
+                    )
+                """)
+                self.migrate(conn)
+        finally:
+            conn.close()
+
+    def migrate(self, conn):
+        """SQLite twin of migrations/001_predictions_query_indexes.sql (idempotent)."""
+        have = {r[1] for r in conn.execute(f"PRAGMA table_info({self.table})")}
+        for col, typ in (
+            ("CreatedAt", "TEXT"), ("Label", "TEXT"), ("ModelProbFake", "REAL"),
+            ("StrongFlags", "INTEGER"), ("SoftFlags", "INTEGER"),
+        ):
+            if col not in have:
+                conn.execute(f"ALTER TABLE {self.table} ADD COLUMN {col} {typ}")
+        # backfill once from the blob so old rows are queryable too;
+        # pre-migration rows get the epoch as CreatedAt, same as the SQL Server script
+        conn.execute(f"""
+            UPDATE {self.table} SET
+                CreatedAt = COALESCE(CreatedAt, '1970-01-01 00:00:00.000'),
+                Label = COALESCE(Label, json_extract(InsightsJson, '$.model.label')),
+                ModelProbFake = COALESCE(ModelProbFake, json_extract(InsightsJson, '$.model.prob_fake')),
+                StrongFlags = COALESCE(StrongFlags, json_extract(InsightsJson, '$.flags.strong')),
+                SoftFlags = COALESCE(SoftFlags, json_extract(InsightsJson, '$.flags.soft'))
+            WHERE CreatedAt IS NULL
+        """)
+        for name, cols in INDEXES:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {self.table} ({cols})")
+
+    def connect(self):
+        return sqlite3.connect(self.path)
+
+    def write(self, row: dict):
+        conn = self.connect()
+        try:
+            with conn:
+                conn.execute(_insert_sql(self.table), [row.get(c) for c in COLUMNS])
+        finally:
+            conn.close()
+
+    def recent(self, limit=50, **filters) -> dict:
+        where, params = _where(**filters)
+        sql = (
+            f"SELECT {', '.join(LIST_COLUMNS)} FROM {self.table}"
+            f"{where} ORDER BY CreatedAt DESC, Id DESC LIMIT ?"
+        )
+        conn = self.connect()
+        try:
+            cur = conn.execute(sql, params + [int(limit) + 1])
+            return _page(cur, cur.fetchall(), limit)
+        finally:
+            conn.close()
+
+
+def make_store():
+    """PREDICTIONS_SQLITE=<path> switches to SQLite, otherwise SQL Server via DB_CONN_STR."""
+    sqlite_path = os.getenv("PREDICTIONS_SQLITE")
+    if sqlite_path:
+        return SqliteStore(sqlite_path)
+    return OdbcStore(os.getenv("DB_CONN_STR"))
+
+# ------------------ BACKGROUND WRITER ------------------
+class PersistQueue:
+    """
+    Bounded queue + one worker thread that writes rows to a store.
+    A row is retried a few times; if the store is still failing (or the queue is full)
+    the row is appended to a local JSONL spill file instead of being lost.
+    The worker replays the spill file when it starts and again (at most every
+    replay_interval seconds) once writes succeed, i.e. after the DB recovers.
+    """
+
+    def __init__(self, store, maxsize=1000, retries=3, backoff=0.5,
+                 spill_path="predictions_spill.jsonl", replay_interval=60.0, replay_on_start=True):
+        self.store = store
+        self.retries = retries
+        self.backoff = backoff
+        self.spill_path = spill_path
+        self.replay_interval = replay_interval
+        self._last_replay = None if replay_on_start else time.monotonic()
+        self._inflight = None
+        self._abandoned = False  # set by close() when it gave up on the worker
+        self._lock = threading.Lock()  # guards _inflight / _abandoned
+        self._q = queue.Queue(maxsize=maxsize)
+        self._spill_lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="persist-writer", daemon=True)
+        self._worker.start()
+
+    def submit(self, row: dict) -> bool:
+        """Never blocks the request: returns False if the row went straight to the spill file."""
+        try:
+            self._q.put_nowait(row)
+            return True
+        except queue.Full:
+            self._spill(row)
+            return False
+
+    def close(self, timeout=5.0):
+        """
+        Flush what is queued and stop the worker; whatever is left goes to the spill file.
+        If the worker is stuck (DB down) its in-flight row is spilled and the worker is
+        told to drop it. A write attempt already running at that moment may still
+        succeed, so that one row can end up both in the DB and in the spill file.
+        """
+        deadline = time.monotonic() + timeout
+        try:
+            self._q.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._worker.join(max(0.0, deadline - time.monotonic()))
+        if not self._worker.is_alive():
+            return
+
+        # the daemon thread dies with the process: keep its rows on disk
+        with self._lock:
+            self._abandoned = True
+            rows = [self._inflight] if self._inflight is not None else []
+            self._inflight = None
+            while True:
+                try:
+                    row = self._q.get_nowait()
+                except queue.Empty:
+                    break
+                if row is not None:
+                    rows.append(row)
+            self._spill_many(rows)
+
+    def replay_spill(self, include_orphans=False) -> int:
+        """
+        Try to write spilled rows again (one attempt each); stops at the first
+        failure and puts that row and everything after it back into the spill file.
+
+        The file is first claimed with an atomic rename, so other processes
+        (gunicorn workers) keep appending to a fresh spill file meanwhile.
+        Progress is recorded next to the claimed file (<claimed>.done, one byte per
+        written row), so include_orphans can resume a replay that crashed; at most
+        the row being written at the crash is inserted twice.
+        """
+        claimed = []
+        candidates = [self.spill_path]
+        if include_orphans:
+            candidates += sorted(p for p in glob.glob(glob.escape(self.spill_path) + ".claimed-*")
+                                 if not p.endswith(".done"))
+        for path in candidates:
+            dest = f"{self.spill_path}.claimed-{os.getpid()}-{time.time_ns()}"
+            try:
+                os.replace(path, dest)
+            except FileNotFoundError:
+                continue  # nothing spilled, or another process claimed it first
+            try:
+                os.replace(path + ".done", dest + ".done")
+            except FileNotFoundError:
+                pass
+            claimed.append(dest)
+        if not claimed:
+            return 0
+
+        # an appender that opened the file just before the rename still writes into it
+        time.sleep(0.2)
+
+        written, leftover = 0, []
+        for path in claimed:
+            with open(path, encoding="utf-8") as f:
+                rows = [json.loads(ln) for ln in f if ln.strip()]
+            done_path = path + ".done"
+            rows = rows[os.path.getsize(done_path) if os.path.exists(done_path) else 0:]
+            if leftover:
+                leftover += rows  # DB already failed: don't touch it again this round
+                continue
+            with open(done_path, "a", encoding="utf-8") as done:
+                for i, row in enumerate(rows):
+                    if not self._write(row, retries=1):
+                        leftover = rows[i:]
+                        break
+                    written += 1
+                    done.write(".")
+                    done.flush()
+
+        self._spill_many(leftover)
+        for path in claimed:
+            os.remove(path)
+            os.remove(path + ".done")
+        return written
+
+    def _run(self):
+        self._maybe_replay()
+        while True:
+            # take the row and mark it in-flight in one step, so close() always sees it
+            with self._lock:
+                if self._abandoned:
+                    return
+                try:
+                    row = self._q.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                self._inflight = row
+            try:
+                if row is None:
+                    return
+                ok = self._write(row)
+                with self._lock:
+                    if self._abandoned:
+                        return  # close() already spilled this row
+                    self._inflight = None
+                    if not ok:
+                        self._spill(row)
+                if ok:
+                    self._maybe_replay()
+            finally:
+                self._q.task_done()
+
+    def _maybe_replay(self):
+        if self._last_replay is not None and time.monotonic() - self._last_replay < self.replay_interval:
+            return
+        self._last_replay = time.monotonic()
+        if os.path.exists(self.spill_path):
+            try:
+                n = self.replay_spill()
+                if n:
+                    print(f"Replayed {n} spilled prediction rows.")
+            except Exception as e:
+                print("Spill replay failed:", e)
+
+    def _write(self, row: dict, retries=None) -> bool:
+        retries = self.retries if retries is None else retries
+        for attempt in range(retries):
+            if self._abandoned:
+                return False  # close() spilled it; don't start another attempt
+            try:
+                self.store.write(row)
+                return True
+            except Exception as e:
+                print(f"Persist attempt {attempt + 1}/{retries} failed: {e}")
+                if attempt + 1 < retries:
+                    time.sleep(self.backoff * (2 ** attempt))
+        return False
+
+    def _spill(self, row: dict):
+        self._spill_many([row])
+
+    def _spill_many(self, rows):
+        """One append for all rows (a single write call, so it lands as one block)."""
+        if not rows:
+            return
+        data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows)
+        with self._spill_lock:
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                f.write(data)
+
+
+if __name__ == "__main__":
+    # python persistence.py replay [spill_path]  -> push spilled rows to the DB now
+    import sys
+    if len(sys.argv) >= 2 and sys.argv[1] == "replay":
+        try:
+            from dotenv import load_dotenv
+            load_dotenv()
+        except ImportError:
+            pass
+        path = sys.argv[2] if len(sys.argv) > 2 else os.getenv("PERSIST_SPILL_PATH", "predictions_spill.jsonl")
+        pq = PersistQueue(make_store(), spill_path=path, replay_on_start=False)
+        print("Replayed rows:", pq.replay_spill(include_orphans=True))
+        pq.close()
+    else:
+        print("usage: python persistence.py replay [spill_path]")
@@ -0,0 +1,121 @@
+# phrase_matcher.py
+import re
+import json
+import unicodedata
+from pathlib import Path
+from functools import lru_cache
+
+# ------------------ UNICODE NORMALIZATION ------------------
+def _bmp_class(pred) -> str:
+    """Regex class body (ranges) for BMP characters where pred(ch) is true."""
+    ranges, start = [], None
+    for cp in range(0x10000 + 1):
+        hit = cp < 0x10000 and pred(chr(cp))
+        if hit and start is None:
+            start = cp
+        elif not hit and start is not None:
+            ranges.append(f"\\u{start:04x}-\\u{cp - 1:04x}")
+            start = None
+    return "".join(ranges)
+
+@lru_cache(maxsize=1)
+def MARKS():
+    """Regex class body for combining marks (matras, virama, nukta...). re's \\w does not include them."""
+    return _bmp_class(lambda ch: unicodedata.category(ch)[0] == "M")
+
+@lru_cache(maxsize=1)
+def FORMAT_RE():
+    # format chars (Cf): ZWJ/ZWNJ inside Indic words, soft hyphen, BOM, bidi marks.
+    # They carry no letters, so they are deleted (not turned into a word break).
+    # ZERO WIDTH SPACE is a real word separator: STRIP_RE turns it into a space.
+    return re.compile(f"[{_bmp_class(lambda ch: unicodedata.category(ch) == 'Cf' and ch != chr(0x200B))}]")
+
+@lru_cache(maxsize=1)
+def STRIP_RE():
+    # drop everything except letters/digits/marks of any script, whitespace and basic email chars
+    return re.compile(rf"[^\w\s@.\-{MARKS()}]|_")
+
+def norm_text(text: str) -> str:
+    """
+    Unicode-aware version of the old ASCII-only norm():
+    NFKC (full-width / compatibility forms, nukta letters) + casefold,
+    keeping Devanagari and other scripts instead of blanking them.
+    """
+    t = unicodedata.normalize("NFKC", text or "").casefold()
+    t = FORMAT_RE().sub("", t)
+    t = STRIP_RE().sub(" ", t)
+    t = re.sub(r"\s+", " ", t).strip()
+    return t
+
+# ------------------ SINGLE-PASS PHRASE MATCHING ------------------
+def _trie_pattern(phrases) -> str:
+    """
+    Phrases -> one regex shaped like a trie: (?:ab(?:c|d)|x...).
+    At each text position the engine follows one path, so the cost per position
+    depends on phrase length, not on how many phrases there are.
+    """
+    trie = {}
+    for p in phrases:
+        node = trie
+        for ch in p:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def walk(node):
+        alts = [re.escape(ch) + walk(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        # a phrase may end here: the rest is optional (greedy -> longest match)
+        return f"(?:{body})?" if "" in node else body
+
+    return walk(trie)
+
+
+class PhraseMatcher:
+    """
+    {rule_key: [phrases]} compiled into a single regex.
+    match(t) returns the set of rule keys whose phrases occur in t (substring
+    semantics, same as the old per-list `any(p in t ...)` checks), in one scan of t.
+    """
+
+    def __init__(self, rules: dict):
+        keys_of = {}
+        for key, phrases in rules.items():
+            for p in phrases:
+                p = norm_text(p)
+                if p:
+                    keys_of.setdefault(p, set()).add(key)
+
+        # the scan reports the longest phrase starting at each position;
+        # every shorter phrase starting there is a prefix of it, so fold their keys in
+        self.keys_for = {}
+        for p in keys_of:
+            ks = set()
+            for i in range(1, len(p) + 1):
+                ks |= keys_of.get(p[:i], set())
+            self.keys_for[p] = frozenset(ks)
+
+        # lookahead = zero-width, so overlapping matches are all seen
+        pattern = _trie_pattern(keys_of)
+        self.regex = re.compile(f"(?=({pattern}))") if pattern else None
+        self.size = len(keys_of)
+
+    def match(self, t: str) -> set:
+        hits = set()
+        if self.regex is None:
+            return hits
+        for m in self.regex.finditer(t):
+            hits |= self.keys_for[m.group(1)]
+        return hits
+
+
+@lru_cache(maxsize=1)
+def I18N_PHRASES():
+    """Non-English phrasings per rule key, merged over all languages in phrases_i18n.json."""
+    cfg = json.loads((Path(__file__).with_name("phrases_i18n.json")).read_text(encoding="utf-8"))
+    merged = {}
+    for lang, rules in cfg.get("rules", {}).items():
+        for key, phrases in rules.items():
+            merged.setdefault(key, []).extend(phrases)
+    return merged
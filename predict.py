@@ -1,13 +1,22 @@
 # predict.py
-import os
 import re
+import time
 import joblib
+from functools import lru_cache
 from skill_salary_rules import run_skill_check, run_salary_check
+from calibration import DEFAULT_MODEL_PATH, load_calibration
+from phrase_matcher import PhraseMatcher, I18N_PHRASES, norm_text
 
 # ------------------ LOAD MODEL ------------------
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-MODEL_PATH = os.path.join(BASE_DIR, "fake_job_model_pipeline.pkl")  # or fake_job_pipeline_v2.pkl
+MODEL_PATH = DEFAULT_MODEL_PATH  # next to this file, independent of the working directory
 model = joblib.load(MODEL_PATH)
+CALIB = load_calibration(MODEL_PATH)  # isotonic table + label thresholds shipped with the model
+
+# Label cutoffs + rule floors/caps shipped with the model (identity: the historical
+# 0.70/0.40 cutoffs and 0.65/0.85/0.45 floors)
+TH = CALIB.thresholds
+FLOORS = CALIB.floors
+SOFT_GATE_RAW = 0.35  # soft-rule gate, on the RAW model probability
 
 
 # ------------------ STRONG SCAM INDICATORS ------------------
@@ -33,6 +42,7 @@ EARN_FAST_WORDS = [
     "earn daily", "earn per day", "earn weekly", "earn per week",
     "quick money", "easy money", "earn from day 1", "start earning today"
 ]
+VAGUE_WORDS = ["work from home", "wfh", "part time", "no experience"]
 DATA_ENTRY_SCAM_WORDS = [
     "captcha", "form filling", "copy paste", "typing job", "data entry work",
     "pay per form", "pay per page", "payment per form", "work per submission"
@@ -50,15 +60,23 @@ LEGIT_SIGNALS = [
     "joining within", "notice period", "background verification"
 ]
 
+# English lists above + other languages/transliterations from phrases_i18n.json
+RULE_WORDS = {
+    "bank": BANK_WORDS, "telegram": TELEGRAM_WORDS, "fee": FEE_WORDS,
+    "no_interview": NO_INTERVIEW_WORDS, "guarantee": GUARANTEE_WORDS,
+    "earn_fast": EARN_FAST_WORDS, "vague": VAGUE_WORDS, "data_entry": DATA_ENTRY_SCAM_WORDS,
+    "whatsapp": WHATSAPP_WORDS, "fast_hire": FAST_HIRE_WORDS, "no_exp_money": NO_EXP_MONEY,
+    "legit": LEGIT_SIGNALS,
+}
+
+@lru_cache(maxsize=1)
+def MATCHER():
+    rules = {k: list(v) + I18N_PHRASES().get(k, []) for k, v in RULE_WORDS.items()}
+    return PhraseMatcher(rules)
+
 # ------------------ NORMALIZATION HELPERS ------------------
 def norm(text: str) -> str:
-    t = (text or "").lower()
-    t = re.sub(r"[^a-z0-9\s@.\-]", " ", t)  # keep basic email chars
-    t = re.sub(r"\s+", " ", t).strip()
-    return t
-
-def has_any(t: str, phrases) -> bool:
-    return any(p in t for p in phrases)
+    return norm_text(text)  # Unicode-aware; keeps Devanagari etc. + basic email chars
 
 def has_email(t: str) -> bool:
     # simple email regex (good enough for project)
@@ -70,56 +88,60 @@ def predict_job(text: str) -> dict:
     t = norm(raw)
 
     # ---- Correct probability of FAKE (class 1) ----
+    t0 = time.perf_counter()
     proba = model.predict_proba([raw])[0]
+    model_ms = (time.perf_counter() - t0) * 1000
     classes = list(model.classes_)
-    model_prob = float(proba[classes.index(1)])  # 1 = fake/fraudulent
+    raw_prob = float(proba[classes.index(1)])  # 1 = fake/fraudulent
+    model_prob = CALIB.apply(raw_prob)
 
     strongFlags = 0
     softFlags = 0
     reasons = []
+    hits = MATCHER().match(t)  # every rule list, one pass over t
 
     # ---------- STRONG RULES ----------
-    if has_any(t, BANK_WORDS):
+    if "bank" in hits:
         strongFlags += 1
         reasons.append("Asks for bank/ID details (IFSC/account/Aadhaar/PAN) before an official offer — common scam sign.")
 
-    if has_any(t, TELEGRAM_WORDS):
+    if "telegram" in hits:
         strongFlags += 1
         reasons.append("Interview/communication only via Telegram — high scam risk.")
 
-    if has_any(t, FEE_WORDS):
+    if "fee" in hits:
         strongFlags += 1
         reasons.append("Mentions registration/processing fee or deposit for a job — very common scam pattern.")
 
     # ✅ FIX: No interview should be strong BY ITSELF (not dependent)
-    if has_any(t, NO_INTERVIEW_WORDS):
+    if "no_interview" in hits:
         strongFlags += 1
         reasons.append("No interview/direct selection — strong scam pattern.")
 
     # Guaranteed/instant offer wording
-    if has_any(t, GUARANTEE_WORDS):
+    if "guarantee" in hits:
         strongFlags += 1
         reasons.append("Guaranteed/instant offer letter promise — very high scam likelihood.")
 
     # Earn fast strong only with vague easy conditions (reduces false positives)
-    if has_any(t, EARN_FAST_WORDS) and has_any(t, ["work from home", "wfh", "part time", "no experience"]):
+    if "earn_fast" in hits and "vague" in hits:
         strongFlags += 1
         reasons.append("Promises fast earnings (daily/weekly) with vague requirements — common scam pattern.")
 
-    if has_any(t, DATA_ENTRY_SCAM_WORDS):
+    if "data_entry" in hits:
         strongFlags += 1
         reasons.append("Mentions captcha/form-filling/pay-per-form work — extremely common scam format.")
 
     # ---------- SOFT RULES ----------
-    if has_any(t, WHATSAPP_WORDS):
+    if "whatsapp" in hits:
         softFlags += 1
         reasons.append("WhatsApp-only contact can be suspicious if company cannot be verified.")
 
-    if has_any(t, FAST_HIRE_WORDS):
+    if "fast_hire" in hits:
         softFlags += 1
         reasons.append("Overly urgent hiring language (shortlist today / immediate joining).")
 
-    if has_any(t, NO_EXP_MONEY):
+    if "no_exp_money" in hits:
         softFlags += 1
         reasons.append("Vague hiring conditions (WFH/part-time/no experience) can be suspicious in scam posts.")
 
@@ -132,34 +154,36 @@ def predict_job(text: str) -> dict:
 
     # ✅ IMPORTANT: don’t instantly force 0.80 for 1 flag (ML becomes useless)
     if strongFlags == 1:
-        final_prob = max(final_prob, 0.65)  # CHECK-ish
+        final_prob = max(final_prob, FLOORS["one_strong"])  # CHECK-ish
     elif strongFlags >= 2:
-        final_prob = max(final_prob, 0.85)  # FAKE-ish
+        final_prob = max(final_prob, FLOORS["two_strong"])  # FAKE-ish
 
     # Soft indicators can push to borderline (not FAKE)
-    if strongFlags == 0 and softFlags >= 2 and model_prob >= 0.35:
-        final_prob = max(final_prob, 0.45)
+    if strongFlags == 0 and softFlags >= 2 and raw_prob >= SOFT_GATE_RAW:
+        final_prob = max(final_prob, FLOORS["soft"])
 
     # Salary RED can push toward FAKE when role confidence is decent
     if salary_check.get("zone") == "RED" and (skill_check.get("role_confidence", 0) >= 0.60):
-        final_prob = max(final_prob, 0.70)
+        final_prob = max(final_prob, TH["fake"])
 
     # ✅ LEGIT DAMPENER: if strongFlags=0 and legit signals exist, cap risk
     legit = 0
-    if has_any(t, LEGIT_SIGNALS):
+    if "legit" in hits:
         legit += 1
     if has_email(t):
         legit += 1
 
     if strongFlags == 0 and legit >= 2:
-        final_prob = min(final_prob, 0.45)
+        final_prob = min(final_prob, FLOORS["legit_cap"])  # never above CHECK
 
     # ---- Label ----
-    label = "FAKE" if final_prob >= 0.70 else ("CHECK" if final_prob >= 0.40 else "REAL")
+    label = CALIB.label(final_prob)
 
     return {
         "prob_fake": round(final_prob, 4),
-        "model": {"prob_fake": round(model_prob, 4), "label": label},
+        "label": label,  # REAL/CHECK/FAKE from the model's own cutoffs; clients show this, not their own threshold
+        "model": {"prob_fake": round(model_prob, 4), "raw_prob_fake": round(raw_prob, 4),
+                  "label": label, "latency_ms": round(model_ms, 3)},
         "flags": {"strong": int(strongFlags), "soft": int(softFlags), "reasons": reasons},
         "skill_check": skill_check,
         "salary_check": salary_check
@@ -0,0 +1,217 @@
+# shadow.py
+"""
+Shadow-model A/B scoring.
+
+A sample of live /predict requests is re-scored by a second model in a separate
+process (shadow_worker.py, lower priority), so the primary response never waits on
+it. Each sampled request appends one JSON line to the shadow log:
+primary vs shadow probability, labels, agreement and per-model latency.
+Samples that could not be scored (queue full, worker dead) are counted and
+written to the same log, so the report shows sampling loss.
+
+    SHADOW_MODEL_PATH=fake_job_pipeline_v2.pkl SHADOW_SAMPLE_RATE=0.1 gunicorn app:app
+    python shadow.py report [shadow_log.jsonl]
+
+The worker is a plain subprocess running shadow_worker.py (not multiprocessing
+"spawn", which re-executes __main__: under `python app.py` that re-imported
+predict.py and loaded the primary model a second time). app.init_shadow() starts
+it explicitly, never on import: gunicorn.conf.py calls it in each gunicorn worker
+after the fork, `python app.py` only in the reloader's serving process.
+A scorer that was created before a fork notices the pid change on its next
+sample and starts a worker for the new process.
+"""
+import os
+import sys
+import json
+import queue
+import random
+import threading
+import subprocess
+from datetime import datetime, timezone
+from calibration import load_calibration
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_LOG_PATH = "shadow_log.jsonl"
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000]
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class ShadowScorer:
+    """Request-side handle: a random() draw and a non-blocking put, nothing else."""
+
+    def __init__(self, model_path, sample_rate=0.05, log_path=DEFAULT_LOG_PATH, maxsize=1000):
+        self.model_path = model_path
+        self.sample_rate = float(sample_rate)
+        self.log_path = log_path
+        self.maxsize = maxsize
+        self._start_lock = threading.Lock()
+        self._start()
+
+    def _start(self):
+        """Worker process + feeder thread owned by the current process."""
+        self._pid = os.getpid()
+        self.dropped = 0
+        self._dead_logged = False
+        self._q = queue.Queue(maxsize=self.maxsize)
+        self._proc = subprocess.Popen(
+            [sys.executable, os.path.join(BASE_DIR, "shadow_worker.py"), self.model_path, self.log_path],
+            stdin=subprocess.PIPE, cwd=BASE_DIR, text=True, encoding="utf-8",
+        )
+        # pipe writes can block when the worker is slow; only this thread ever waits on them
+        self._feeder = threading.Thread(target=self._feed, name="shadow-feeder", daemon=True)
+        self._feeder.start()
+
+    @classmethod
+    def from_env(cls):
+        """None unless SHADOW_MODEL_PATH is set."""
+        path = os.getenv("SHADOW_MODEL_PATH")
+        if not path:
+            return None
+        return cls(
+            os.path.abspath(path),
+            sample_rate=os.getenv("SHADOW_SAMPLE_RATE", "0.05"),
+            log_path=os.path.abspath(os.getenv("SHADOW_LOG_PATH", DEFAULT_LOG_PATH)),
+        )
+
+    def submit(self, text: str, result: dict):
+        if random.random() >= self.sample_rate:
+            return
+        if self._pid != os.getpid():
+            # created before a fork (e.g. gunicorn --preload): the feeder thread and
+            # the pipe belong to the parent, so start this process's own worker
+            with self._start_lock:
+                if self._pid != os.getpid():
+                    print("Shadow scorer was forked; starting a shadow worker for this process.")
+                    self._start()
+        if self._proc.poll() is not None:
+            self.dropped += 1
+            if not self._dead_logged:
+                self._dead_logged = True
+                print(f"Shadow worker exited (code {self._proc.returncode}); dropping shadow samples.")
+                self._log_drops()
+            return
+
+        m = result.get("model") or {}
+        p = float(m.get("prob_fake", 0) or 0)  # model-only (calibrated), before rules
+        try:
+            self._q.put_nowait({
+                "ts": _now(),
+                "pid": os.getpid(),
+                "dropped": self.dropped,
+                "text": text,
+                "primary_prob": p,
+                "primary_label": load_calibration().label(p),
+                "primary_ms": m.get("latency_ms"),
+            })
+        except queue.Full:
+            self.dropped += 1  # shadow is behind; never make the request wait
+
+    def close(self, timeout=5.0):
+        if self._pid != os.getpid():
+            return  # forked copy that never started a worker; the parent closes its own
+        try:
+            self._q.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._feeder.join(timeout)
+        try:
+            self._proc.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+        self._log_drops()
+
+    def _feed(self):
+        while True:
+            item = self._q.get()
+            try:
+                if item is None:
+                    self._proc.stdin.close()
+                    return
+                self._proc.stdin.write(json.dumps(item, ensure_ascii=False) + "\n")
+                self._proc.stdin.flush()
+            except (BrokenPipeError, OSError, ValueError):
+                self.dropped += 1  # worker died under us; submit() reports it
+
+    def _log_drops(self):
+        """Cumulative drop count for this process; report() keeps the max per pid."""
+        try:
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"type": "drops", "ts": _now(), "pid": os.getpid(), "dropped": self.dropped}) + "\n")
+        except OSError as e:
+            print("Could not write shadow drop count:", e)
+
+# ------------------ REPORT ------------------
+def _pct(values, q):
+    if not values:
+        return None
+    s = sorted(values)
+    return s[min(len(s) - 1, int(q * len(s)))]
+
+def _histogram(values):
+    counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    for v in values:
+        i = next((i for i, b in enumerate(LATENCY_BUCKETS_MS) if v <= b), len(LATENCY_BUCKETS_MS))
+        counts[i] += 1
+    return counts
+
+def report(log_path=DEFAULT_LOG_PATH):
+    try:
+        with open(log_path, encoding="utf-8") as f:
+            lines = [json.loads(ln) for ln in f if ln.strip()]
+    except FileNotFoundError:
+        lines = []
+
+    # drop counts are cumulative per serving process (pid): keep the highest seen
+    dropped_by_pid = {}
+    for r in lines:
+        if "pid" in r and "dropped" in r:
+            dropped_by_pid[r["pid"]] = max(dropped_by_pid.get(r["pid"], 0), r["dropped"])
+    dropped = sum(dropped_by_pid.values())
+
+    recs = [r for r in lines if r.get("type") != "drops"]
+    if not recs:
+        print("No shadow records in", log_path)
+        if dropped:
+            print(f"Samples dropped: {dropped} (none were scored)")
+        return
+
+    n = len(recs)
+    agree = sum(1 for r in recs if r["agree"])
+    deltas = [r["delta"] for r in recs if r.get("delta") is not None]
+    abs_d = [abs(d) for d in deltas]
+
+    print(f"Shadow run: {n} scored requests ({recs[0]['ts']} .. {recs[-1]['ts']})")
+    print(f"Samples dropped: {dropped} of {n + dropped} sampled ({dropped / (n + dropped):.1%})")
+    print(f"Label agreement: {agree}/{n} = {agree / n:.1%}")
+
+    labels = ["REAL", "CHECK", "FAKE"]
+    print("\nPrimary (rows) vs shadow (cols):")
+    print(" " * 8 + "".join(f"{l:>8}" for l in labels))
+    for pl in labels:
+        row = [sum(1 for r in recs if r["primary_label"] == pl and r["shadow_label"] == sl) for sl in labels]
+        print(f"{pl:>8}" + "".join(f"{c:>8}" for c in row))
+
+    if deltas:
+        print("\nProbability delta (shadow - primary):")
+        print(f"  mean {sum(deltas) / len(deltas):+.4f}   mean |d| {sum(abs_d) / len(abs_d):.4f}")
+        print(f"  |d| p50 {_pct(abs_d, 0.50):.4f}   p95 {_pct(abs_d, 0.95):.4f}   max {max(abs_d):.4f}")
+
+    print("\nModel latency (ms):")
+    edges = [f"<={b}" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+    print(f"{'':>10}" + "".join(f"{e:>7}" for e in edges) + f"{'p50':>9}{'p95':>9}{'p99':>9}")
+    for name in ("primary", "shadow"):
+        ms = [r[f"{name}_ms"] for r in recs if r.get(f"{name}_ms") is not None]
+        if not ms:
+            continue
+        hist = "".join(f"{c:>7}" for c in _histogram(ms))
+        print(f"{name:>10}{hist}{_pct(ms, 0.50):>9.2f}{_pct(ms, 0.95):>9.2f}{_pct(ms, 0.99):>9.2f}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "report":
+        report(sys.argv[2] if len(sys.argv) > 2 else DEFAULT_LOG_PATH)
+    else:
+        print("usage: python shadow.py report [shadow_log.jsonl]")
@@ -0,0 +1,62 @@
+# shadow_worker.py
+"""
+Shadow scoring process (started by shadow.ShadowScorer, not run by hand).
+
+    python shadow_worker.py <model_path> <log_path>
+
+Reads one JSON request per line on stdin, scores it with the shadow model and
+appends one JSON record per line to the log. Imports only the shadow model's
+dependencies, never app.py / predict.py, so the primary model is not loaded twice.
+"""
+import os
+import sys
+import json
+import time
+import joblib
+from calibration import load_calibration
+
+
+def main(model_path, log_path):
+    try:
+        os.nice(10)  # yield CPU to the request-serving process
+    except (AttributeError, OSError):
+        pass
+
+    model = joblib.load(model_path)
+    calib = load_calibration(model_path)
+    fake_idx = list(model.classes_).index(1)
+
+    with open(log_path, "a", encoding="utf-8") as log:
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            try:
+                t0 = time.perf_counter()
+                raw_prob = float(model.predict_proba([item["text"]])[0][fake_idx])
+                shadow_ms = (time.perf_counter() - t0) * 1000
+            except Exception as e:
+                print("Shadow scoring failed:", e, file=sys.stderr)
+                continue
+
+            prob = calib.apply(raw_prob)
+            label = calib.label(prob)
+            rec = {
+                "ts": item["ts"],
+                "pid": item["pid"],
+                "dropped": item["dropped"],
+                "primary_prob": item["primary_prob"],
+                "shadow_prob": round(prob, 4),
+                "delta": round(prob - item["primary_prob"], 4),
+                "primary_label": item["primary_label"],
+                "shadow_label": label,
+                "agree": label == item["primary_label"],
+                "primary_ms": item["primary_ms"],
+                "shadow_ms": round(shadow_ms, 3),
+            }
+            log.write(json.dumps(rec) + "\n")
+            log.flush()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1], sys.argv[2])
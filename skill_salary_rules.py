@@ -1,6 +1,7 @@
-import json, re, math
+import json, re, math, unicodedata
 from pathlib import Path
 from functools import lru_cache
+from phrase_matcher import MARKS, FORMAT_RE
 
 @lru_cache(maxsize=1)
 def CFG():
@@ -12,15 +13,26 @@ def BANDS():
 
 def _norm(t):
     # IMPORTANT: do NOT remove commas here (salary needs original separators)
-    t = (t or "").lower()
+    t = FORMAT_RE().sub("", unicodedata.normalize("NFKC", t or "")).lower()
     t = re.sub(r"\s+", " ", t).strip()
     return t
 
+@lru_cache(maxsize=1)
+def ALIASES():
+    # keys normalized like the text they are matched against
+    return {_norm(k): v for k, v in CFG().get("aliases", {}).items()}
+
+@lru_cache(maxsize=1)
+def ALIAS_RE():
+    # all aliases in one alternation (longest first) -> one pass instead of one re.sub per alias;
+    # word edges include combining marks so Devanagari aliases match whole words
+    keys = sorted(ALIASES(), key=len, reverse=True)
+    w = rf"[\w{MARKS()}]"
+    return re.compile(rf"(?<!{w})(?:{'|'.join(re.escape(k) for k in keys)})(?!{w})") if keys else re.compile(r"$^")
+
 def _alias(t):
-    a = CFG().get("aliases", {})
-    for k in sorted(a, key=len, reverse=True):
-        t = re.sub(rf"\b{re.escape(k)}\b", a[k], t)
-    return t
+    a = ALIASES()
+    return ALIAS_RE().sub(lambda m: a[m.group(0)], t)
 
 @lru_cache(maxsize=1)
 def SKILL_RE():
@@ -156,9 +168,17 @@ def _num(s: str):
         return None
 
 
+# clock times ("10 a.m.", "7pm", "9:30 p.m.") are shift timings, not "per month" amounts
+CLOCK_RE = re.compile(r"(?<![\d,.])(?:1[0-2]|0?[1-9])(?:[:.][0-5]\d)?\s*(?:a\.?\s?m|p\.?\s?m)(?:\.|\b)")
+# "25,000 p.m." -> per month; only right after an amount (clock times are gone by then)
+AMOUNT_PM_RE = re.compile(r"(\d[\d,]*(?:\.\d+)?\s*(?:k|l|lac|lakh|cr|crore)?\s*(?:(?:inr|rs\.?|₹)\s*)?)p\.\s?m\.?(?!\w)")
+MIN_MONTHLY_INR = 100  # smaller "ranges" are hours/days ("shift 9 to 6"), not salaries
+
 def parse_salary_inr_month(text):
     raw = text or ""
-    t = _alias(_norm(raw))
+    t = CLOCK_RE.sub(" ", _norm(raw))
+    t = AMOUNT_PM_RE.sub(r"\1 per month", t)
+    t = _alias(t)
 
     t = t.replace("₹", " inr ")
     t = re.sub(r"\brs\.?\b", " inr ", t)
@@ -167,23 +187,24 @@ def parse_salary_inr_month(text):
 
     month_hint = bool(re.search(r"\b(per month|monthly|month|stipend|pm)\b", t))
 
-    range_re = re.search(
+    range_res = re.finditer(
         r"(?:\binr\b\s*)?([\d][\d,]*(?:\.\d+)?\s*(?:k|l|lac|lakh|cr|crore)?)\s*"
+        r"(?:\binr\b\s*)?"  # currency after the amount too ("15,000 रुपये" -> "15,000 inr")
         r"(?:to|\-|–|—)\s*"
         r"(?:\binr\b\s*)?([\d][\d,]*(?:\.\d+)?\s*(?:k|l|lac|lakh|cr|crore)?)",
         t,
         flags=re.I
     )
 
-    if range_re and month_hint:
+    for range_re in (range_res if month_hint else []):
         a = _num(range_re.group(1))
         b = _num(range_re.group(2))
-        if a is not None and b is not None:
+        if a is not None and b is not None and max(a, b) >= MIN_MONTHLY_INR:
             return {"ok": True, "min": min(a, b), "max": max(a, b), "confidence": "HIGH"}
 
     single_re = re.search(
         r"(?:stipend\s*[:\-]?\s*)?(?:\binr\b\s*)?([\d][\d,]*(?:\.\d+)?\s*(?:k|l|lac|lakh|cr|crore)?)\s*"
-        r"(per month|monthly|month|pm)\b",
+        r"(?:\binr\b\s*)?(per month|monthly|month|pm)\b",
         t,
         flags=re.I
     )
@@ -0,0 +1,74 @@
+import os
+import sys
+import types
+import importlib
+
+import pytest
+
+from persistence import SqliteStore, build_row
+
+
+def _fake_predict(text):
+    return {"prob_fake": 0.91, "label": "FAKE",
+            "model": {"prob_fake": 0.8, "label": "FAKE", "latency_ms": 1.0},
+            "flags": {"strong": 2, "soft": 0, "reasons": []}}
+
+
+def _import_app(monkeypatch):
+    # app imports predict, which loads the model pickle at import time
+    monkeypatch.setitem(sys.modules, "predict", types.SimpleNamespace(predict_job=_fake_predict))
+    monkeypatch.delitem(sys.modules, "app", raising=False)
+    return importlib.import_module("app")
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    pytest.importorskip("flask")
+    db = str(tmp_path / "p.sqlite3")
+    monkeypatch.setenv("PREDICTIONS_SQLITE", db)
+    monkeypatch.delenv("SHADOW_MODEL_PATH", raising=False)
+    app = _import_app(monkeypatch)
+
+    store = SqliteStore(db)
+    for i in range(5):
+        row = build_row(f"post {i}", _fake_predict(""))
+        row.update(CreatedAt=f"2026-01-01 10:0{i}:00.000")
+        store.write(row)
+    yield app.app.test_client()
+    monkeypatch.delitem(sys.modules, "app", raising=False)
+
+
+def test_predictions_pages(client):
+    first = client.get("/predictions?limit=2&status=LIKELY_FAKE")
+    assert first.status_code == 200
+    assert [r["Id"] for r in first.get_json()["items"]] == [5, 4]
+    cursor = first.get_json()["next_cursor"]
+    nxt = client.get("/predictions", query_string={"limit": 2, "cursor": cursor}).get_json()
+    assert [r["Id"] for r in nxt["items"]] == [3, 2]
+
+    window = client.get("/predictions?since=2026-01-01T10:01:00Z&until=2026-01-01T10:03:00").get_json()
+    assert [r["Id"] for r in window["items"]] == [3, 2]
+
+
+def test_predictions_limit_is_clamped(client):
+    store = SqliteStore(os.environ["PREDICTIONS_SQLITE"])
+    for i in range(200):
+        store.write(build_row(f"more {i}", _fake_predict("")))
+    assert len(client.get("/predictions?limit=0").get_json()["items"]) == 1
+    assert len(client.get("/predictions?limit=100000").get_json()["items"]) == 200
+    assert len(client.get("/predictions").get_json()["items"]) == 50
+
+
+@pytest.mark.parametrize("query", ["cursor=not-a-cursor", "since=yesterday", "until=2026-13-01", "limit=ten"])
+def test_predictions_bad_query_is_400(client, query):
+    res = client.get("/predictions?" + query)
+    assert res.status_code == 400
+    assert res.get_json()["error"]
+
+
+def test_import_does_not_start_shadow(tmp_path, monkeypatch):
+    pytest.importorskip("flask")
+    monkeypatch.setenv("SHADOW_MODEL_PATH", str(tmp_path / "shadow.pkl"))
+    app = _import_app(monkeypatch)
+    assert app._shadow is None  # only gunicorn.conf.py / __main__ call init_shadow()
+    monkeypatch.delitem(sys.modules, "app", raising=False)
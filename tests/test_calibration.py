@@ -0,0 +1,51 @@
+import pytest
+
+np = pytest.importorskip("numpy")  # numpy/sklearn are training-only deps
+pytest.importorskip("sklearn")
+
+from calibration import Calibration, DEFAULT_FLOORS, DEFAULT_THRESHOLDS, fit_isotonic
+
+
+def test_apply_matches_np_interp():
+    c = Calibration(x=[0.1, 0.4, 0.4, 0.9], y=[0.0, 0.2, 0.3, 0.8])
+    ps = np.linspace(-0.2, 1.2, 57)
+    assert np.allclose([c.apply(p) for p in ps], c.apply_many(ps))
+
+
+def test_fit_isotonic_maps_raw_cutoffs():
+    rng = np.random.default_rng(0)
+    raw = rng.random(20000)
+    y = (rng.random(20000) < 0.1 * raw).astype(int)  # rare positives: calibrated << raw
+    c = fit_isotonic(raw, y)
+    for name, raw_cut in DEFAULT_THRESHOLDS.items():
+        assert c.thresholds[name] == round(c.apply(raw_cut), 6)
+    assert c.thresholds["check"] < c.thresholds["decision"] < c.thresholds["fake"] < DEFAULT_THRESHOLDS["fake"]
+    assert c.label(c.apply(0.75)) == "FAKE" and c.label(c.apply(0.2)) == "REAL"
+    for name in ("one_strong", "soft", "legit_cap"):
+        assert c.floors[name] < c.thresholds["fake"]
+
+
+def test_identity_without_table():
+    c = Calibration()
+    assert c.apply(0.37) == 0.37 and c.thresholds == DEFAULT_THRESHOLDS
+    assert c.floors == DEFAULT_FLOORS  # historical 0.65/0.85/0.45 rule floors, unchanged
+
+
+def test_collapsed_cutoffs_rejected():
+    # every raw score below 0.8 lands on one isotonic step -> check == fake
+    raw = np.r_[np.linspace(0.0, 0.79, 500), np.linspace(0.8, 1.0, 100)]
+    y = np.r_[np.zeros(500, dtype=int), np.ones(100, dtype=int)]
+    with pytest.raises(ValueError, match="CHECK band"):
+        fit_isotonic(raw, y)
+    with pytest.raises(ValueError, match="CHECK band"):
+        Calibration(thresholds={"check": 0.3, "fake": 0.3})
+
+
+def test_floor_on_fake_step_falls_back_to_check_band():
+    # raw 0.65 and 0.70 share a step, 0.40 does not -> one_strong would be FAKE
+    raw = np.r_[np.linspace(0.0, 0.5, 500), np.linspace(0.6, 1.0, 400)]
+    y = np.r_[np.zeros(450, dtype=int), np.ones(50, dtype=int), np.ones(400, dtype=int)]
+    c = fit_isotonic(raw, y)
+    t = c.thresholds
+    assert t["check"] < t["fake"]
+    assert c.floors["one_strong"] == round((t["check"] + t["fake"]) / 2, 6)
@@ -0,0 +1,229 @@
+import os
+import json
+import sqlite3
+
+from persistence import build_row, PersistQueue, SqliteStore
+
+RESULT = {
+    "prob_fake": 0.91,
+    "model": {"prob_fake": 0.42, "label": "FAKE"},
+    "flags": {"strong": 2, "soft": 1, "reasons": ["fee", "telegram"]},
+    "skill_check": {"role_guess": "Data Analyst", "role_confidence": 0.8,
+                    "skills_found": ["sql"], "reasons": ["telegram", "skills ok"]},
+    "salary_check": {"zone": "RED", "offered_min": 90000, "offered_max": 120000,
+                     "anomaly_score": 0.9, "flag": True, "reasons": ["too high"]},
+}
+
+
+class FlakyStore:
+    """Fails the first `fail` writes, then records rows."""
+
+    def __init__(self, fail=0):
+        self.fail = fail
+        self.rows = []
+
+    def write(self, row):
+        if self.fail:
+            self.fail -= 1
+            raise RuntimeError("db down")
+        self.rows.append(row)
+
+
+def _spilled(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(ln) for ln in f if ln.strip()]
+
+
+def test_build_row_columns():
+    row = build_row("job text", RESULT)
+    assert row["JobText"] == "job text"
+    assert row["Status"] == "LIKELY_FAKE"
+    assert row["Reasons"] == "fee\ntelegram\nskills ok\ntoo high"  # de-duplicated, in order
+    assert row["RoleGuess"] == "Data Analyst"
+    assert json.loads(row["SkillsFound"]) == ["sql"]
+    assert row["SalaryZone"] == "RED" and row["SalaryFlag"] == 1
+    assert row["Label"] == "FAKE" and row["ModelProbFake"] == 0.42
+    assert row["StrongFlags"] == 2 and row["SoftFlags"] == 1
+    assert json.loads(row["InsightsJson"]) == RESULT
+
+    empty = build_row("x", {"prob_fake": 0.1})
+    assert empty["Status"] == "LIKELY_REAL" and empty["Reasons"] is None
+
+
+def test_retry_then_succeed(tmp_path):
+    store = FlakyStore(fail=2)
+    pq = PersistQueue(store, retries=3, backoff=0.001, spill_path=str(tmp_path / "spill.jsonl"))
+    pq.submit({"JobText": "a"})
+    pq.close()
+    assert [r["JobText"] for r in store.rows] == ["a"]
+    assert _spilled(pq.spill_path) == []
+
+
+def test_spill_then_replay(tmp_path):
+    spill = str(tmp_path / "spill.jsonl")
+    store = FlakyStore(fail=10**6)
+    pq = PersistQueue(store, retries=2, backoff=0.001, spill_path=spill)
+    pq.submit({"JobText": "a"})
+    pq.submit({"JobText": "b"})
+    pq.close()
+    assert [r["JobText"] for r in _spilled(spill)] == ["a", "b"]
+
+    store.fail = 0  # DB is back
+    assert pq.replay_spill() == 2
+    assert [r["JobText"] for r in store.rows] == ["a", "b"]
+    assert not os.path.exists(spill)
+    assert os.listdir(tmp_path) == []  # claimed file removed too
+
+
+def test_replay_on_worker_start(tmp_path):
+    spill = tmp_path / "spill.jsonl"
+    spill.write_text(json.dumps({"JobText": "old"}) + "\n", encoding="utf-8")
+    store = FlakyStore()
+    pq = PersistQueue(store, backoff=0.001, spill_path=str(spill))
+    pq.close()
+    assert [r["JobText"] for r in store.rows] == ["old"]
+
+
+def test_close_spills_rows_when_worker_is_stuck(tmp_path):
+    spill = str(tmp_path / "spill.jsonl")
+    store = FlakyStore(fail=10**6)
+    pq = PersistQueue(store, retries=3, backoff=0.3, spill_path=spill)
+    for name in "abc":
+        pq.submit({"JobText": name})
+    pq.close(timeout=0.2)
+    assert sorted(r["JobText"] for r in _spilled(spill)) == ["a", "b", "c"]
+
+    # the worker wakes from its backoff, sees it was abandoned and neither retries nor re-spills
+    pq._worker.join(2)
+    assert not pq._worker.is_alive()
+    assert store.fail == 10**6 - 1
+    assert len(_spilled(spill)) == 3
+
+
+def test_replay_stops_at_first_failure(tmp_path):
+    spill = tmp_path / "spill.jsonl"
+    spill.write_text("".join(json.dumps({"JobText": n}) + "\n" for n in "abcde"), encoding="utf-8")
+    store = FlakyStore()
+    calls = []
+
+    def write(row):
+        calls.append(row["JobText"])
+        if len(calls) == 3:
+            raise RuntimeError("db down")
+        store.rows.append(row)
+
+    store.write = write
+    pq = PersistQueue(store, retries=3, backoff=5.0, spill_path=str(spill), replay_on_start=False)
+    assert pq.replay_spill() == 2
+    assert calls == ["a", "b", "c"]  # one attempt, no backoff, nothing after the failure
+    assert [r["JobText"] for r in _spilled(spill)] == ["c", "d", "e"]
+    assert sorted(os.listdir(tmp_path)) == ["spill.jsonl"]
+    pq.close()
+
+
+def test_orphan_replay_resumes_after_crash(tmp_path):
+    spill = str(tmp_path / "spill.jsonl")
+    orphan = spill + ".claimed-1-1"
+    with open(orphan, "w", encoding="utf-8") as f:
+        f.write("".join(json.dumps({"JobText": n}) + "\n" for n in "abc"))
+    with open(orphan + ".done", "w", encoding="utf-8") as f:
+        f.write("..")  # a and b were written before the crash
+    store = FlakyStore()
+    pq = PersistQueue(store, spill_path=spill, replay_on_start=False)
+    assert pq.replay_spill(include_orphans=True) == 1
+    assert [r["JobText"] for r in store.rows] == ["c"]
+    assert os.listdir(tmp_path) == []
+    pq.close()
+
+
+def test_sqlite_store_write(tmp_path):
+    store = SqliteStore(str(tmp_path / "p.sqlite3"))
+    store.write(build_row("job text", RESULT))
+    conn = sqlite3.connect(store.path)
+    try:
+        assert conn.execute("SELECT JobText, Status, SalaryZone FROM Predictions").fetchall() == [
+            ("job text", "LIKELY_FAKE", "RED")
+        ]
+    finally:
+        conn.close()
+
+
+def _seed(store):
+    """7 rows, 1 minute apart, with a mix of status / role / zone."""
+    specs = [
+        ("LIKELY_FAKE", "Sales", "RED"),
+        ("LIKELY_REAL", "Sales", "GREEN"),
+        ("LIKELY_FAKE", "Data Analyst", "RED"),
+        ("LIKELY_REAL", "Data Analyst", "YELLOW"),
+        ("LIKELY_FAKE", "Sales", "GREEN"),
+        ("LIKELY_FAKE", "Data Analyst", "RED"),
+        ("LIKELY_REAL", "Sales", "RED"),
+    ]
+    for i, (status, role, zone) in enumerate(specs):
+        row = build_row(f"post {i}", RESULT)
+        row.update(Status=status, RoleGuess=role, SalaryZone=zone,
+                   CreatedAt=f"2026-01-01 10:0{i}:00.000")
+        store.write(row)
+
+
+def _ids(page):
+    return [item["Id"] for item in page["items"]]
+
+
+def test_recent_keyset_paging(tmp_path):
+    store = SqliteStore(str(tmp_path / "p.sqlite3"))
+    _seed(store)
+
+    seen, cursor = [], None
+    while True:
+        page = store.recent(limit=3, cursor=cursor)
+        assert "JobText" not in page["items"][0] and "InsightsJson" not in page["items"][0]
+        seen += _ids(page)
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [7, 6, 5, 4, 3, 2, 1]  # newest first, no gaps or repeats
+
+
+def test_recent_filters(tmp_path):
+    store = SqliteStore(str(tmp_path / "p.sqlite3"))
+    _seed(store)
+
+    assert _ids(store.recent(status="LIKELY_FAKE")) == [6, 5, 3, 1]
+    assert _ids(store.recent(role="Data Analyst")) == [6, 4, 3]
+    assert _ids(store.recent(zone="RED")) == [7, 6, 3, 1]
+    assert _ids(store.recent(status="LIKELY_FAKE", role="Sales", zone="RED")) == [1]
+    window = store.recent(since="2026-01-01 10:02:00.000", until="2026-01-01 10:05:00.000")
+    assert _ids(window) == [5, 4, 3]
+
+    page = store.recent(status="LIKELY_FAKE", limit=2)
+    assert _ids(page) == [6, 5]
+    assert _ids(store.recent(status="LIKELY_FAKE", limit=2, cursor=page["next_cursor"])) == [3, 1]
+
+
+def test_migrate_backfills_old_rows(tmp_path):
+    path = str(tmp_path / "old.sqlite3")
+    conn = sqlite3.connect(path)
+    with conn:
+        # table as it was before the typed columns existed
+        conn.execute("""
+            CREATE TABLE Predictions (
+                Id INTEGER PRIMARY KEY AUTOINCREMENT,
+                JobText TEXT, Status TEXT, ProbFake REAL, Reasons TEXT,
+                RoleGuess TEXT, RoleConfidence REAL, SkillsFound TEXT, SkillReasons TEXT,
+                SalaryMin INTEGER, SalaryMax INTEGER, SalaryZone TEXT,
+                SalaryAnomalyScore REAL, SalaryFlag INTEGER, SalaryReasons TEXT,
+                InsightsJson TEXT
+            )
+        """)
+        conn.execute("INSERT INTO Predictions (Status, InsightsJson) VALUES (?, ?)",
+                     ("LIKELY_FAKE", json.dumps(RESULT)))
+    conn.close()
+
+    store = SqliteStore(path)
+    (item,) = store.recent()["items"]
+    assert item["CreatedAt"] == "1970-01-01 00:00:00.000"
+    assert item["Label"] == "FAKE" and item["StrongFlags"] == 2
+    assert store.recent(since="2000-01-01 00:00:00.000")["items"] == []
@@ -0,0 +1,56 @@
+import random
+
+from phrase_matcher import PhraseMatcher, norm_text
+from skill_salary_rules import parse_salary_inr_month
+
+RULES = {
+    "fee": ["registration fee", "deposit", "fees dena hoga", "रजिस्ट्रेशन फीस"],
+    "earn": ["earn daily", "easy money"],
+    "money": ["easy money", "earn daily money"],
+    "whatsapp": ["whatsapp", "wa.me", "হোয়াটসঅ্যাপ"],
+}
+
+
+def test_norm_keeps_scripts_and_drops_format_chars():
+    assert norm_text("Ｔｅｌｅｇｒａｍ  पे संपर्क!") == "telegram पे संपर्क"
+    # ZWJ inside a Bengali word must not split it
+    assert norm_text("হোয়াটসঅ\u200d্যাপ") == norm_text("হোয়াটসঅ্যাপ")
+    assert norm_text("soft\u00adware") == "software"
+    assert norm_text("a\u200bb") == "a b"  # zero width space is a word break
+
+
+def test_match_same_as_substring_checks():
+    m = PhraseMatcher(RULES)
+    random.seed(0)
+    words = [p for v in RULES.values() for p in v] + ["the", "job", "earn", "money", "fee", "wa"]
+    for _ in range(2000):
+        t = norm_text(" ".join(random.choice(words) for _ in range(random.randint(1, 8))))
+        expected = {k for k, v in RULES.items() if any(norm_text(p) in t for p in v)}
+        assert m.match(t) == expected, t
+
+
+def test_match_multilingual():
+    m = PhraseMatcher(RULES)
+    assert m.match(norm_text("Registration fees dena hoga, contact হোয়াটসঅ\u200d্যাপ")) == {"fee", "whatsapp"}
+    assert m.match(norm_text("रजिस्ट्रेशन फीस ₹500")) == {"fee"}
+
+
+def test_hindi_salary_with_trailing_currency():
+    assert parse_salary_inr_month("वेतन 15,000 रुपये प्रति माह")["min"] == 15000
+    p = parse_salary_inr_month("वेतन 15 हज़ार - 20 हज़ार रुपये प्रति माह")
+    assert (p["min"], p["max"]) == (15000, 20000)
+
+
+def test_shift_timings_are_not_salary():
+    p = parse_salary_inr_month("Shift 10 a.m. to 7 p.m. Salary 25,000 per month")
+    assert (p["min"], p["max"]) == (25000, 25000)
+    assert not parse_salary_inr_month("Work 9 a.m. - 6 p.m. daily")["ok"]
+    assert not parse_salary_inr_month("Timing 10am - 7pm")["ok"]
+    p = parse_salary_inr_month("Salary Rs 25,000 p.m., shift 9 to 6")
+    assert (p["min"], p["max"]) == (25000, 25000)
+
+
+def test_per_month_after_amount():
+    p = parse_salary_inr_month("Salary 15,000 to 20,000 p.m.")
+    assert (p["min"], p["max"]) == (15000, 20000)
+    assert parse_salary_inr_month("Stipend 15k pm")["min"] == 15000
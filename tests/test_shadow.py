@@ -0,0 +1,59 @@
+import os
+import json
+
+import pytest
+
+from shadow import ShadowScorer, report
+
+
+def _rec(pid, dropped, agree=True):
+    return {"ts": "2026-01-01T00:00:00+00:00", "pid": pid, "dropped": dropped,
+            "primary_prob": 0.8, "shadow_prob": 0.7, "delta": -0.1,
+            "primary_label": "FAKE", "shadow_label": "FAKE" if agree else "CHECK",
+            "agree": agree, "primary_ms": 3.0, "shadow_ms": 2.0}
+
+
+def test_report_missing_log(tmp_path, capsys):
+    report(str(tmp_path / "nope.jsonl"))
+    assert "No shadow records" in capsys.readouterr().out
+
+
+def test_report_counts_drops_per_process(tmp_path, capsys):
+    log = tmp_path / "shadow.jsonl"
+    lines = [_rec(1, 0), _rec(1, 2), _rec(2, 1, agree=False),
+             {"type": "drops", "ts": "2026-01-01T00:00:01+00:00", "pid": 1, "dropped": 3}]
+    log.write_text("".join(json.dumps(r) + "\n" for r in lines), encoding="utf-8")
+    report(str(log))
+    out = capsys.readouterr().out
+    assert "Samples dropped: 4 of 7 sampled" in out  # pid 1 -> 3, pid 2 -> 1
+    assert "Label agreement: 2/3" in out
+
+
+def test_dead_worker_drops_are_logged(tmp_path):
+    log = tmp_path / "shadow.jsonl"
+    s = ShadowScorer(str(tmp_path / "missing.pkl"), sample_rate=1.0, log_path=str(log))
+    s._proc.wait(30)
+    for _ in range(3):
+        s.submit("text", {"model": {"prob_fake": 0.1, "latency_ms": 1.0}})
+    s.close()
+    assert s.dropped == 3
+    drops = [json.loads(ln) for ln in log.read_text(encoding="utf-8").splitlines()]
+    assert drops[-1]["type"] == "drops" and drops[-1]["dropped"] == 3
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+def test_forked_scorer_starts_its_own_worker(tmp_path):
+    s = ShadowScorer(str(tmp_path / "missing.pkl"), sample_rate=1.0, log_path=str(tmp_path / "shadow.jsonl"))
+    parent_worker = s._proc.pid
+    pid = os.fork()
+    if pid == 0:  # child: like a gunicorn worker forked from a --preload master
+        ok = False
+        try:
+            s.submit("text", {"model": {"prob_fake": 0.1}})
+            ok = s._pid == os.getpid() and s._proc.pid != parent_worker and s._feeder.is_alive()
+            s.close()
+        finally:
+            os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    s.close()
+    assert os.WEXITSTATUS(status) == 0
@@ -0,0 +1,98 @@
+# text_features.py
+import os
+import glob
+import json
+import hashlib
+import pandas as pd
+
+# One column list for training, scoring and graphs (the model must see the same
+# text at train and score time). salary_range is included so the salary rules
+# in make_scored_csv.py can see it too.
+TEXT_COLS = [
+    "title","location","department","company_profile","description",
+    "requirements","benefits","employment_type","required_experience",
+    "required_education","industry","function",
+    "salary_range"
+]
+
+CACHE_DIR = ".cache"
+CACHE_VERSION = "1"  # bump if build_full_text() output changes
+
+
+def build_full_text(df: pd.DataFrame, cols=TEXT_COLS) -> pd.Series:
+    """
+    Space-joined text columns, identical to
+    df[cols].fillna("").astype(str).agg(" ".join, axis=1).
+
+    agg(axis=1) builds a pandas Series for every row. Here fillna/astype run once
+    per column; the join itself is still one str.join call per row (map over zip),
+    but with no per-row pandas objects, and each output string is allocated once.
+    Column-wise concatenation (Series.str.cat / +) measured ~6x slower: it
+    re-copies the growing string once per column.
+    """
+    cols = [c for c in cols if c in df.columns]
+    if not cols:
+        return pd.Series("", index=df.index)
+    parts = [df[c].fillna("").astype(str).to_numpy(dtype=object) for c in cols]
+    return pd.Series(list(map(" ".join, zip(*parts))), index=df.index)
+
+
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _cache_paths(csv_path: str, cols, cache_dir: str):
+    """(prefix for this CSV, cache file, meta file); the key is path + size + mtime, no file read."""
+    full = os.path.abspath(csv_path)
+    st = os.stat(full)
+    prefix = "postings_" + hashlib.sha256(full.encode("utf-8")).hexdigest()[:12]
+    key = hashlib.sha256(
+        f"{st.st_size}|{st.st_mtime_ns}|{'|'.join(cols)}|v{CACHE_VERSION}".encode("utf-8")
+    ).hexdigest()[:16]
+    base = os.path.join(cache_dir, f"{prefix}_{key}")
+    return os.path.join(cache_dir, prefix), base + ".pkl", base + ".json"
+
+
+def load_postings(csv_path: str, cols=TEXT_COLS, use_cache=True, cache_dir=CACHE_DIR,
+                  verify_hash=False) -> pd.DataFrame:
+    """
+    read_csv + a "full_text" column.
+    The parsed frame (with full_text) is cached on disk, keyed on the CSV's path,
+    size and mtime, so a warm load skips both read_csv and the join.
+    verify_hash=True also checks the CSV's sha256 against the one stored at build time
+    (reads the whole file; use it when mtime cannot be trusted, e.g. after a copy).
+    """
+    if not use_cache:
+        df = pd.read_csv(csv_path)
+        df["full_text"] = build_full_text(df, cols)
+        return df
+
+    prefix, path, meta_path = _cache_paths(csv_path, cols, cache_dir)
+    if os.path.exists(path) and os.path.exists(meta_path):
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if not verify_hash or meta.get("sha256") == _sha256(csv_path):
+            return pd.read_pickle(path)
+
+    df = pd.read_csv(csv_path)
+    df["full_text"] = build_full_text(df, cols)
+
+    # one cache entry per CSV path: drop entries for older versions of the file
+    for old in glob.glob(glob.escape(prefix) + "_*"):
+        if old not in (path, meta_path):
+            os.remove(old)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # write to a temp name + os.replace: a concurrent run (train + score) never reads
+    # a half-written file. Temp names don't match the prefix glob above.
+    tmp = os.path.join(cache_dir, f".tmp-{os.getpid()}-{os.path.basename(path)}")
+    df.to_pickle(tmp)
+    os.replace(tmp, path)
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"csv": os.path.abspath(csv_path), "rows": len(df), "sha256": _sha256(csv_path)}, f)
+    os.replace(tmp, meta_path)
+    return df
@@ -1,30 +1,30 @@
-import pandas as pd
 import joblib
 from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import roc_auc_score, classification_report
+from sklearn.metrics import roc_auc_score, classification_report, brier_score_loss, precision_score, recall_score
+from calibration import DEFAULT_THRESHOLDS, fit_isotonic, calibration_path
+from text_features import load_postings
 
-# 1) Load data
-df = pd.read_csv("fake_job_postings.csv")
+MODEL_PATH = "fake_job_model_pipeline.pkl"
+
+# 1) Load data (+ full_text, shared with scoring/graphs)
+df = load_postings("fake_job_postings.csv")
 
 # 2) Target
 y = df["fraudulent"].astype(int)
 
-# 3) Combine text fields
-text_cols = [
-    "title","location","department","company_profile","description",
-    "requirements","benefits","employment_type","required_experience",
-    "required_education","industry","function"
-]
-text_cols = [c for c in text_cols if c in df.columns]
-X_text = df[text_cols].fillna("").astype(str).agg(" ".join, axis=1)
+# 3) Combined text fields
+X_text = df["full_text"]
 
-# 4) Split
+# 4) Split (train / calibration / test)
 X_train, X_test, y_train, y_test = train_test_split(
     X_text, y, test_size=0.2, random_state=42, stratify=y
 )
+X_train, X_cal, y_train, y_cal = train_test_split(
+    X_train, y_train, test_size=0.2, random_state=42, stratify=y_train
+)
 
 # 5) Model
 model = Pipeline([
@@ -34,11 +34,28 @@ model = Pipeline([
 
 model.fit(X_train, y_train)
 
-# 6) Evaluate
-proba = model.predict_proba(X_test)[:, 1]
-print("ROC-AUC:", roc_auc_score(y_test, proba))
-print(classification_report(y_test, (proba >= 0.5).astype(int), digits=4))
-
-# 7) Save model
-joblib.dump(model, "fake_job_model_pipeline.pkl")
-print("Saved: fake_job_model_pipeline.pkl")
+# 6) Calibrate on held-out rows (class_weight="balanced" inflates raw probabilities).
+#    Cutoffs = the old raw operating points (0.70/0.40/0.50) mapped through the
+#    calibration, so labels keep their precision/recall on the new scale. Raises
+#    ValueError (nothing is saved) if check and fake land on one isotonic step.
+calib = fit_isotonic(model.predict_proba(X_cal)[:, 1], y_cal, raw_cutoffs=DEFAULT_THRESHOLDS)
+print("Calibration table points:", len(calib.x))
+print("Thresholds (calibrated):", calib.thresholds)
+print("Rule floors (calibrated):", calib.floors)
+
+# 7) Evaluate (AUC on raw scores: the isotonic steps create ties that understate ranking)
+raw = model.predict_proba(X_test)[:, 1]
+proba = calib.apply_many(raw)
+print("ROC-AUC:", roc_auc_score(y_test, raw))
+print("Brier raw:", round(brier_score_loss(y_test, raw), 4), "calibrated:", round(brier_score_loss(y_test, proba), 4))
+for name in ("fake", "check"):
+    pred = (proba >= calib.thresholds[name]).astype(int)
+    print(f"{name:>5} cutoff {calib.thresholds[name]:.4f}: precision {precision_score(y_test, pred, zero_division=0):.4f}"
+          f"  recall {recall_score(y_test, pred, zero_division=0):.4f}")
+THRESH = calib.thresholds["decision"]
+print(classification_report(y_test, (proba >= THRESH).astype(int), digits=4))
+
+# 8) Save model + calibration table (same basename, read by predict/scoring/graphs)
+joblib.dump(model, MODEL_PATH)
+calib.save(calibration_path(MODEL_PATH))
+print("Saved:", MODEL_PATH, "+", calibration_path(MODEL_PATH))